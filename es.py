@@ -1,5 +1,8 @@
+import math
+
 import numpy as np
 import scipy as scp
+from numba import njit, prange
 
 
 def compute_ranks(x):
@@ -9,24 +12,89 @@ def compute_ranks(x):
     (https://github.com/openai/evolution-strategies-starter/blob/master/es_distributed/es.py)
     """
     assert x.ndim == 1
-    ranks = np.empty(len(x), dtype=int)
-    ranks[x.argsort()] = np.arange(len(x))
+    ranks = np.empty(len(x), dtype=np.int32)
+    ranks[np.argsort(x, kind="quicksort")] = np.arange(len(x), dtype=np.int32)
     return ranks
 
 
-def compute_centered_ranks(x):
+def compute_centered_ranks(x, out=None):
     """
     https://github.com/openai/evolution-strategies-starter/blob/master/es_distributed/es.py
+    If given, out is a float32 buffer of x's shape that receives the result.
+    """
+    if out is None:
+        out = np.empty(x.shape, dtype=np.float32)
+    ranks = compute_ranks(x.ravel()).reshape(x.shape)
+    np.multiply(ranks, 1.0 / (x.size - 1), out=out)
+    out -= 0.5
+    return out
+
+
+def compute_top_k(x, k):
     """
-    y = compute_ranks(x.ravel()).reshape(x.shape).astype(np.float32)
-    y /= x.size - 1
-    y -= 0.5
-    return y
+    Returns indices of the k largest entries of x, largest first.
+    Selects with argpartition so only the top k get sorted.
+    """
+    top = np.argpartition(x, -k)[-k:]
+    return top[np.argsort(x[top], kind="quicksort")[::-1]]
 
 
 def compute_weight_decay(weight_decay, model_param_list):
-    model_param_grid = np.array(model_param_list)
-    return -weight_decay * np.mean(model_param_grid * model_param_grid, axis=1)
+    model_param_grid = np.asarray(model_param_list)
+    # row-wise sum of squares without materializing the squared grid
+    sq_norms = np.einsum("ij,ij->i", model_param_grid, model_param_grid)
+    return (-weight_decay / model_param_grid.shape[1]) * sq_norms
+
+
+# fused element-wise update kernels, one pass over the parameter vector
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _adam_step(m, v, g, step, a, beta1, beta2, epsilon):
+    for i in prange(m.size):
+        m[i] = beta1 * m[i] + (1.0 - beta1) * g[i]
+        v[i] = beta2 * v[i] + (1.0 - beta2) * g[i] * g[i]
+        step[i] = -a * m[i] / (np.sqrt(v[i]) + epsilon)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _momentum_step(v, g, step, stepsize, momentum):
+    for i in prange(v.size):
+        v[i] = momentum * v[i] + (1.0 - momentum) * g[i]
+        step[i] = -stepsize * v[i]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _pepg_update(
+    epsilon,
+    rT,
+    rS,
+    sigma,
+    change_mu,
+    sigma_alpha,
+    sigma_max_change,
+    sigma_limit,
+    sigma_decay,
+):
+    # one pass per parameter column: change_mu = rT @ epsilon / 2, and sigma moves
+    # by the clipped alpha * rS @ ((epsilon ** 2 - sigma ** 2) / sigma), then decays
+    batch_size, num_params = epsilon.shape
+    for j in prange(num_params):
+        s = sigma[j]
+        s2 = s * s
+        acc_mu = 0.0
+        acc_sigma = 0.0
+        for i in range(batch_size):
+            e = epsilon[i, j]
+            acc_mu += rT[i] * e
+            acc_sigma += rS[i] * (e * e - s2)
+        change_mu[j] = 0.5 * acc_mu
+        max_change = sigma_max_change * s
+        change_sigma = min(max(sigma_alpha * acc_sigma / s, -max_change), max_change)
+        s += change_sigma
+        if s > sigma_limit:
+            s *= sigma_decay
+        sigma[j] = s
 
 
 # adopted from:
@@ -44,7 +112,8 @@ class Optimizer(object):
         self.t += 1
         step = self._compute_step(globalg)
         theta = self.pi.mu
-        ratio = np.linalg.norm(step) / (np.linalg.norm(theta) + self.epsilon)
+        # dot-product norms, no |x| temporaries
+        ratio = np.sqrt(step @ step) / (np.sqrt(theta @ theta) + self.epsilon)
         self.pi.mu = theta + step
         return ratio
 
@@ -66,12 +135,12 @@ class SGD(Optimizer):
     def __init__(self, pi, stepsize, momentum=0.9):
         Optimizer.__init__(self, pi)
         self.v = np.zeros(self.dim, dtype=np.float32)
+        self.step = np.zeros(self.dim, dtype=np.float32)
         self.stepsize, self.momentum = stepsize, momentum
 
     def _compute_step(self, globalg):
-        self.v = self.momentum * self.v + (1.0 - self.momentum) * globalg
-        step = -self.stepsize * self.v
-        return step
+        _momentum_step(self.v, globalg, self.step, self.stepsize, self.momentum)
+        return self.step
 
 
 class Adam(Optimizer):
@@ -82,17 +151,19 @@ class Adam(Optimizer):
         self.beta2 = beta2
         self.m = np.zeros(self.dim, dtype=np.float32)
         self.v = np.zeros(self.dim, dtype=np.float32)
+        self.step = np.zeros(self.dim, dtype=np.float32)
+        self.beta1_t = 1.0
+        self.beta2_t = 1.0
 
     def _compute_step(self, globalg):
-        a = (
-            self.stepsize
-            * np.sqrt(1 - self.beta2 ** self.t)
-            / (1 - self.beta1 ** self.t)
+        # running beta ** t products for the bias correction
+        self.beta1_t *= self.beta1
+        self.beta2_t *= self.beta2
+        a = self.stepsize * math.sqrt(1 - self.beta2_t) / (1 - self.beta1_t)
+        _adam_step(
+            self.m, self.v, globalg, self.step, a, self.beta1, self.beta2, self.epsilon
         )
-        self.m = self.beta1 * self.m + (1 - self.beta1) * globalg
-        self.v = self.beta2 * self.v + (1 - self.beta2) * (globalg * globalg)
-        step = -a * self.m / (np.sqrt(self.v) + self.epsilon)
-        return step
+        return self.step
 
 
 class SimpleAdam:
@@ -102,20 +173,22 @@ class SimpleAdam:
         self.beta2 = beta2
         self.m = np.zeros(num_params, dtype=np.float32)
         self.v = np.zeros(num_params, dtype=np.float32)
+        self.step = np.zeros(num_params, dtype=np.float32)
+        self.beta1_t = 1.0
+        self.beta2_t = 1.0
         self.t = 0
         self.epsilon = 1e-08
 
     def compute_step(self, gradient):
         self.t += 1
-        a = (
-            self.stepsize
-            * np.sqrt(1 - self.beta2 ** self.t)
-            / (1 - self.beta1 ** self.t)
+        # running beta ** t products for the bias correction
+        self.beta1_t *= self.beta1
+        self.beta2_t *= self.beta2
+        a = self.stepsize * math.sqrt(1 - self.beta2_t) / (1 - self.beta1_t)
+        _adam_step(
+            self.m, self.v, gradient, self.step, a, self.beta1, self.beta2, self.epsilon
         )
-        self.m = self.beta1 * self.m + (1 - self.beta1) * gradient
-        self.v = self.beta2 * self.v + (1 - self.beta2) * (gradient * gradient)
-        step = -a * self.m / (np.sqrt(self.v) + self.epsilon)
-        return step
+        return self.step
 
 
 class SimpleSGD:
@@ -130,12 +203,12 @@ class SimpleSGD:
 class SimpleSGDMomentum:
     def __init__(self, stepsize, num_params, momentum=0.9):
         self.v = np.zeros(num_params, dtype=np.float32)
+        self.step = np.zeros(num_params, dtype=np.float32)
         self.stepsize, self.momentum = stepsize, momentum
 
     def compute_step(self, gradient):
-        self.v = self.momentum * self.v + (1.0 - self.momentum) * gradient
-        step = -self.stepsize * self.v
-        return step
+        _momentum_step(self.v, gradient, self.step, self.stepsize, self.momentum)
+        return self.step
 
 
 def create_optimizer(parameter_dict, num_params):
@@ -157,6 +230,10 @@ def create_optimizer(parameter_dict, num_params):
 class CMAES:
     """CMA-ES wrapper."""
 
+    # ask() returns one (popsize, num_params) array, so the whole population can
+    # be scored by a single vectorized objective call and handed back to tell()
+    supports_batch = True
+
     def __init__(
         self,
         num_params,  # number of model parameters
@@ -187,17 +264,17 @@ class CMAES:
 
     def ask(self):
         """returns a list of parameters"""
-        self.solutions = np.array(self.es.ask())
+        self.solutions = np.asarray(self.es.ask())
         return self.solutions
 
     def tell(self, reward_table_result, *_):
-        reward_table = -np.array(reward_table_result)
+        """takes a list or (popsize,) array of rewards"""
+        reward_table = -np.asarray(reward_table_result, dtype=np.float64)
         if self.weight_decay > 0:
             l2_decay = compute_weight_decay(self.weight_decay, self.solutions)
             reward_table += l2_decay
-        self.es.tell(
-            self.solutions, (reward_table).tolist()
-        )  # convert minimizer to maximizer.
+        # convert minimizer to maximizer; pycma iterates the array directly
+        self.es.tell(self.solutions, reward_table)
 
     def current_param(self):
         return self.es.result[5]  # mean solution, presumably better with noise
@@ -221,6 +298,8 @@ class CMAES:
 class SimpleGA:
     """Simple Genetic Algorithm."""
 
+    supports_batch = True  # see CMAES
+
     def __init__(
         self,
         num_params,  # number of model parameters
@@ -231,6 +310,7 @@ class SimpleGA:
         elite_ratio=0.1,  # percentage of the elites
         forget_best=False,  # forget the historical best elites
         weight_decay=0.01,  # weight decay coefficient
+        seed=None,  # seed for the noise generator
     ):
 
         self.num_params = num_params
@@ -243,36 +323,33 @@ class SimpleGA:
         self.elite_popsize = int(self.popsize * self.elite_ratio)
 
         self.sigma = self.sigma_init
-        self.elite_params = np.zeros((self.elite_popsize, self.num_params))
+        self.elite_params = np.zeros(
+            (self.elite_popsize, self.num_params), dtype=np.float32
+        )
         self.elite_rewards = np.zeros(self.elite_popsize)
-        self.best_param = np.zeros(self.num_params)
+        self.best_param = np.zeros(self.num_params, dtype=np.float32)
         self.best_reward = 0
         self.first_iteration = True
         self.forget_best = forget_best
         self.weight_decay = weight_decay
+        self.rng = np.random.default_rng(seed)
+        self._eps_buf = np.empty((self.popsize, self.num_params), dtype=np.float32)
 
     def rms_stdev(self):
         return self.sigma  # same sigma for all parameters.
 
     def ask(self):
         """returns a list of parameters"""
-        self.epsilon = np.random.randn(self.popsize, self.num_params) * self.sigma
-        solutions = []
-
-        def mate(a, b):
-            c = np.copy(a)
-            idx = np.where(np.random.rand((c.size)) > 0.5)
-            c[idx] = b[idx]
-            return c
-
-        elite_range = range(self.elite_popsize)
-        for i in range(self.popsize):
-            idx_a = np.random.choice(elite_range)
-            idx_b = np.random.choice(elite_range)
-            child_params = mate(self.elite_params[idx_a], self.elite_params[idx_b])
-            solutions.append(child_params + self.epsilon[i])
-
-        solutions = np.array(solutions)
+        self.epsilon = self.rng.standard_normal(dtype=np.float32, out=self._eps_buf)
+        self.epsilon *= self.sigma
+
+        # uniform crossover of randomly paired elites, whole population at once
+        idx_a = self.rng.integers(0, self.elite_popsize, size=self.popsize)
+        idx_b = self.rng.integers(0, self.elite_popsize, size=self.popsize)
+        mask = self.rng.random((self.popsize, self.num_params)) > 0.5
+        children = np.where(mask, self.elite_params[idx_b], self.elite_params[idx_a])
+
+        solutions = children + self.epsilon
         self.solutions = solutions
 
         return solutions
@@ -296,7 +373,7 @@ class SimpleGA:
             reward = np.concatenate([reward_table, self.elite_rewards])
             solution = np.concatenate([self.solutions, self.elite_params])
 
-        idx = np.argsort(reward)[::-1][0 : self.elite_popsize]
+        idx = compute_top_k(reward, self.elite_popsize)
 
         self.elite_rewards = reward[idx]
         self.elite_params = solution[idx]
@@ -332,6 +409,8 @@ class SimpleGA:
 class OpenES:
     """ Basic Version of OpenAI Evolution Strategies."""
 
+    supports_batch = True  # see CMAES
+
     def __init__(
         self,
         num_params,  # number of model parameters
@@ -346,8 +425,9 @@ class OpenES:
         antithetic=False,  # whether to use antithetic sampling
         weight_decay=0.01,  # weight decay coefficient
         rank_fitness=True,  # use rank rather than fitness numbers
-        forget_best=True,
-    ):  # forget historical best
+        forget_best=True,  # forget historical best
+        seed=None,  # seed for the noise generator
+    ):
 
         self.num_params = num_params
         self.sigma_decay = sigma_decay
@@ -364,8 +444,9 @@ class OpenES:
             self.half_popsize = int(self.popsize / 2)
 
         self.reward = np.zeros(self.popsize)
-        self.mu = np.zeros(self.num_params)
-        self.best_mu = np.zeros(self.num_params)
+        self._ranks_out = np.empty(self.popsize, dtype=np.float32)
+        self.mu = np.zeros(self.num_params, dtype=np.float32)
+        self.best_mu = np.zeros(self.num_params, dtype=np.float32)
         self.best_reward = 0
         self.first_interation = True
         self.forget_best = forget_best
@@ -373,6 +454,15 @@ class OpenES:
         self.rank_fitness = rank_fitness
         if self.rank_fitness:
             self.forget_best = True  # always forget the best one if we rank
+        self.rng = np.random.default_rng(seed)
+        # Fortran order keeps epsilon.T C-contiguous for the gradient gemv
+        shape = (self.popsize, self.num_params)
+        self._eps_buf = np.empty(shape, dtype=np.float32, order="F")
+        self._solutions = np.empty(shape, dtype=np.float32, order="F")
+        if self.antithetic:
+            self._eps_half_buf = np.empty(
+                (self.half_popsize, self.num_params), dtype=np.float32
+            )
         # choose optimizer
         self.optimizer = create_optimizer(optimizer, num_params)
 
@@ -381,15 +471,26 @@ class OpenES:
         return np.mean(np.sqrt(sigma * sigma))
 
     def ask(self):
-        """returns a list of parameters"""
+        """
+        returns a (popsize, num_params) array of parameters
+        The array is a buffer reused by every ask(); copy it to keep it past the
+        next call.
+        """
         # antithetic sampling
         if self.antithetic:
-            self.epsilon_half = np.random.randn(self.half_popsize, self.num_params)
-            self.epsilon = np.concatenate([self.epsilon_half, -self.epsilon_half])
+            self.epsilon_half = self.rng.standard_normal(
+                dtype=np.float32, out=self._eps_half_buf
+            )
+            self._eps_buf[: self.half_popsize] = self.epsilon_half
+            np.negative(self.epsilon_half, out=self._eps_buf[self.half_popsize :])
         else:
-            self.epsilon = np.random.randn(self.popsize, self.num_params)
+            # the transposed view is C-contiguous, so the generator can fill it
+            self.rng.standard_normal(dtype=np.float32, out=self._eps_buf.T)
+        self.epsilon = self._eps_buf
 
-        self.solutions = self.mu.reshape(1, self.num_params) + self.epsilon * self.sigma
+        np.multiply(self.epsilon, self.sigma, out=self._solutions)
+        self._solutions += self.mu
+        self.solutions = self._solutions
 
         return self.solutions
 
@@ -402,16 +503,16 @@ class OpenES:
         reward = np.array(reward_table_result)
 
         if self.rank_fitness:
-            reward = compute_centered_ranks(reward)
+            reward = compute_centered_ranks(reward, out=self._ranks_out)
 
         if self.weight_decay > 0:
             l2_decay = compute_weight_decay(self.weight_decay, self.solutions)
             reward += l2_decay
 
-        idx = np.argsort(reward)[::-1]
+        best_idx = np.argmax(reward)
 
-        best_reward = reward[idx[0]]
-        best_mu = self.solutions[idx[0]]
+        best_reward = reward[best_idx]
+        best_mu = np.copy(self.solutions[best_idx])  # solutions buffer is reused
 
         self.curr_best_reward = best_reward
         self.curr_best_mu = best_mu
@@ -427,12 +528,13 @@ class OpenES:
 
         # main bit:
         # standardize the rewards to have a gaussian distribution
-        normalized_reward = compute_centered_ranks(reward)
-        gradient = (
-            1.0
-            / (self.popsize * self.sigma)
-            * np.dot(self.epsilon.T, normalized_reward)
-        )
+        # ranked rewards are only re-ranked when weight decay may have reordered them
+        if self.rank_fitness and self.weight_decay <= 0:
+            normalized_reward = reward  # already centered ranks
+        else:
+            normalized_reward = compute_centered_ranks(reward, out=self._ranks_out)
+        gradient = self.epsilon.T @ normalized_reward
+        gradient *= 1.0 / (self.popsize * self.sigma)
 
         self.mu -= self.optimizer.compute_step(gradient)
 
@@ -447,7 +549,7 @@ class OpenES:
         return self.curr_best_mu
 
     def set_mu(self, mu):
-        self.mu = np.array(mu)
+        self.mu = np.array(mu, dtype=np.float32)
 
     def best_param(self):
         return self.best_mu
@@ -464,6 +566,8 @@ class OpenES:
 class PEPG:
     """Extension of PEPG with bells and whistles."""
 
+    supports_batch = True  # see CMAES
+
     def __init__(
         self,
         num_params,  # number of model parameters
@@ -480,8 +584,9 @@ class PEPG:
         average_baseline=True,  # set baseline to average of batch
         weight_decay=0.01,  # weight decay coefficient
         rank_fitness=True,  # use rank rather than fitness numbers
-        forget_best=True,
-    ):  # don't keep the historical best solution
+        forget_best=True,  # don't keep the historical best solution
+        seed=None,  # seed for the noise generator
+    ):
 
         self.num_params = num_params
         self.sigma_init = sigma_init
@@ -510,16 +615,21 @@ class PEPG:
 
         self.forget_best = forget_best
         self.batch_reward = np.zeros(self.batch_size * 2)
-        self.mu = np.zeros(self.num_params)
-        self.sigma = np.ones(self.num_params) * self.sigma_init
-        self.curr_best_mu = np.zeros(self.num_params)
-        self.best_mu = np.zeros(self.num_params)
+        self._ranks_out = np.empty(self.popsize, dtype=np.float32)
+        self.mu = np.zeros(self.num_params, dtype=np.float32)
+        self.sigma = np.full(self.num_params, self.sigma_init, dtype=np.float32)
+        self._change_mu = np.zeros(self.num_params, dtype=np.float32)
+        self.curr_best_mu = np.zeros(self.num_params, dtype=np.float32)
+        self.best_mu = np.zeros(self.num_params, dtype=np.float32)
         self.best_reward = 0
         self.first_interation = True
         self.weight_decay = weight_decay
         self.rank_fitness = rank_fitness
         if self.rank_fitness:
             self.forget_best = True  # always forget the best one if we rank
+        self.rng = np.random.default_rng(seed)
+        # without an average baseline the first row stays zero (the mu itself)
+        self._eps_buf = np.zeros((self.popsize, self.num_params), dtype=np.float32)
         # choose optimizer
         self.optimizer = Adam(self, learning_rate)
 
@@ -530,18 +640,16 @@ class PEPG:
     def ask(self):
         """returns a list of parameters"""
         # antithetic sampling
-        self.epsilon = np.random.randn(
-            self.batch_size, self.num_params
-        ) * self.sigma.reshape(1, self.num_params)
-        self.epsilon_full = np.concatenate([self.epsilon, -self.epsilon])
         if self.average_baseline:
-            epsilon = self.epsilon_full
+            self.epsilon_full = self._eps_buf
         else:
             # first population is mu, then positive epsilon, then negative epsilon
-            epsilon = np.concatenate(
-                [np.zeros((1, self.num_params)), self.epsilon_full]
-            )
-        solutions = self.mu.reshape(1, self.num_params) + epsilon
+            self.epsilon_full = self._eps_buf[1:]
+        self.epsilon = self.epsilon_full[: self.batch_size]
+        self.rng.standard_normal(dtype=np.float32, out=self.epsilon)
+        np.multiply(self.epsilon, self.sigma, out=self.epsilon)
+        np.negative(self.epsilon, out=self.epsilon_full[self.batch_size :])
+        solutions = self.mu.reshape(1, self.num_params) + self._eps_buf
         self.solutions = solutions
         return solutions
 
@@ -554,7 +662,7 @@ class PEPG:
         reward_table = np.array(reward_table_result)
 
         if self.rank_fitness:
-            reward_table = compute_centered_ranks(reward_table)
+            reward_table = compute_centered_ranks(reward_table, out=self._ranks_out)
 
         if self.weight_decay > 0:
             l2_decay = compute_weight_decay(self.weight_decay, self.solutions)
@@ -569,14 +677,15 @@ class PEPG:
 
         reward = reward_table[reward_offset:]
         if self.use_elite:
-            idx = np.argsort(reward)[::-1][0 : self.elite_popsize]
+            idx = compute_top_k(reward, self.elite_popsize)
+            best_idx = idx[0]
         else:
-            idx = np.argsort(reward)[::-1]
+            best_idx = np.argmax(reward)
 
-        best_reward = reward[idx[0]]
+        best_reward = reward[best_idx]
         if best_reward > b or self.average_baseline:
-            best_mu = self.mu + self.epsilon_full[idx[0]]
-            best_reward = reward[idx[0]]
+            best_mu = self.mu + self.epsilon_full[best_idx]
+            best_reward = reward[best_idx]
         else:
             best_mu = self.mu
             best_reward = b
@@ -585,7 +694,7 @@ class PEPG:
         self.curr_best_mu = best_mu
 
         if self.first_interation:
-            self.sigma = np.ones(self.num_params) * self.sigma_init
+            self.sigma = np.full(self.num_params, self.sigma_init, dtype=np.float32)
             self.first_interation = False
             self.best_reward = self.curr_best_reward
             self.best_mu = best_mu
@@ -594,9 +703,24 @@ class PEPG:
                 self.best_mu = best_mu
                 self.best_reward = self.curr_best_reward
 
-        # short hand
-        epsilon = self.epsilon
-        sigma = self.sigma
+        # mean drift and adaptive sigma share a single pass over epsilon;
+        # sigma is updated in place, clipped so it moves at most sigma_max_change
+        # of its value, then annealed
+        rT = reward[: self.batch_size] - reward[self.batch_size :]
+        reward_avg = (reward[: self.batch_size] + reward[self.batch_size :]) / 2.0
+        rS = reward_avg - b
+        change_mu = self._change_mu
+        _pepg_update(
+            self.epsilon,
+            rT,
+            rS,
+            self.sigma,
+            change_mu,
+            max(self.sigma_alpha, 0.0),
+            self.sigma_max_change,
+            self.sigma_limit,
+            min(self.sigma_decay, 1.0),
+        )
 
         # update the mean
 
@@ -604,37 +728,12 @@ class PEPG:
         if self.use_elite:
             self.mu += self.epsilon_full[idx].mean(axis=0)
         else:
-            rT = reward[: self.batch_size] - reward[self.batch_size :]
-            change_mu = np.dot(rT, epsilon)/2
             self.optimizer.stepsize = self.learning_rate
             update_ratio = self.optimizer.update(
                 -change_mu
             )  # adam, rmsprop, momentum, etc.
             # self.mu += (change_mu * self.learning_rate) # normal SGD method
 
-        # adaptive sigma
-        # normalization
-        if self.sigma_alpha > 0:
-            stdev_reward = 1.0
-            if not self.rank_fitness:
-                stdev_reward = reward.std()
-            S = (
-                epsilon * epsilon - (sigma * sigma).reshape(1, self.num_params)
-            ) / sigma.reshape(1, self.num_params)
-            reward_avg = (reward[: self.batch_size] + reward[self.batch_size :]) / 2.0
-            rS = reward_avg - b
-            delta_sigma = np.dot(rS,S) 
-
-            # adjust sigma according to the adaptive sigma calculation
-            # for stability, don't let sigma move more than 10% of orig value
-            change_sigma = self.sigma_alpha * delta_sigma
-            change_sigma = np.minimum(change_sigma, self.sigma_max_change * self.sigma)
-            change_sigma = np.maximum(change_sigma, -self.sigma_max_change * self.sigma)
-            self.sigma += change_sigma
-
-        if self.sigma_decay < 1:
-            self.sigma[self.sigma > self.sigma_limit] *= self.sigma_decay
-
         if (
             self.learning_rate_decay < 1
             and self.learning_rate > self.learning_rate_limit
@@ -645,7 +744,7 @@ class PEPG:
         return self.curr_best_mu
 
     def set_mu(self, mu):
-        self.mu = np.array(mu)
+        self.mu = np.array(mu, dtype=np.float32)
 
     def best_param(self):
         return self.best_mu
@@ -670,6 +769,7 @@ class NSAbstract:
         metapopulation_size=10,
         k=5,
         antithetic=False,  # whether to use antithetic sampling
+        seed=None,  # seed for the noise generator
     ):
         self.optimizers = [
             create_optimizer(optimizer_params, num_params)
@@ -688,6 +788,8 @@ class NSAbstract:
         self.best_reward = 0
         self.best = None
         self.weight = weight
+        self.rng = np.random.default_rng(seed)
+        self._eps_buf = np.empty((self.popsize, self.num_params), dtype=np.float32)
 
     def rms_stdev(self):
         sigma = self.sigma
@@ -699,41 +801,35 @@ class NSAbstract:
         unscaled_update = np.dot(self.epsilon.T, weights)
         return unscaled_update / scale
 
+    def calculate_novelties(self, characteristics):
+        """mean distance of each row to its k nearest stored characteristics"""
+        distances = scp.spatial.distance.cdist(characteristics, self.characteristics)
+        k = min(self.k, distances.shape[1])
+        nearest = np.partition(distances, k - 1, axis=1)[:, :k]
+        return np.mean(nearest, axis=1)
+
     def calculate_novelty(self, characteristic):
-        distances = []
-        for solution_characteristics in self.characteristics:
-            if solution_characteristics == characteristic:
-                distances.append(0)
-                continue
-            distances = scp.spatial.distance.cdist(solution_characteristics, characteristic)
-            mean_distance = np.mean(distances)
-            distances.append(mean_distance)
-        distances = np.array(distances)
-        nearest = np.partition(distances, self.k)[:self.k]
-        mean = np.mean(nearest)
-        return mean
+        return self.calculate_novelties(characteristic.reshape(1, -1))[0]
 
     def ask(self):
         """returns a list of parameters"""
         # antithetic sampling
         if self.antithetic:
-            self.epsilon_half = np.random.normal(
-                scale=self.sigma, size=(self.half_popsize, self.num_params)
+            self.epsilon_half = self.rng.standard_normal(
+                dtype=np.float32, out=self._eps_buf[: self.half_popsize]
             )
-            self.epsilon = np.concatenate([self.epsilon_half, -self.epsilon_half])
+            self.epsilon_half *= self.sigma
+            np.negative(self.epsilon_half, out=self._eps_buf[self.half_popsize :])
         else:
-            self.epsilon = np.random.normal(
-                scale=self.sigma, size=(self.popsize, self.num_params)
-            )
+            self.rng.standard_normal(dtype=np.float32, out=self._eps_buf)
+            self._eps_buf *= self.sigma
+        self.epsilon = self._eps_buf
 
-        novelties = np.array(
-            [
-                self.calculate_novelty(self.characteristics[i,:])
-                for i in self.characteristics_indices
-            ]
+        novelties = self.calculate_novelties(
+            self.characteristics[self.characteristics_indices]
         )
         probs = novelties / np.sum(novelties)
-        self.current_index = np.random.choice([*range(self.metapopulation_size)], p=probs)
+        self.current_index = self.rng.choice(self.metapopulation_size, p=probs)
         self.current_solution = self.population[self.current_index]
         self.current_solutions = (
             self.current_solution.reshape(1, self.num_params) + self.epsilon
@@ -773,7 +869,7 @@ class NSAbstract:
         return self.current_solution
 
     def set_mu(self, mu):
-        self.mu = np.array(mu)
+        self.mu = np.array(mu, dtype=np.float32)
 
     def best_param(self):
         return self.best
@@ -783,7 +879,9 @@ class NSAbstract:
         return (self.best, self.best_reward, self.best_reward, self.sigma)
 
     def init(self, evaluator):
-        pop = np.random.randn(self.metapopulation_size, self.num_params)
+        pop = self.rng.standard_normal(
+            (self.metapopulation_size, self.num_params), dtype=np.float32
+        )
         fitness, characteristics = evaluator(pop)
         self.characteristics = np.array(characteristics)
         self.population = pop
@@ -805,6 +903,7 @@ class NSES(NSAbstract):
         metapopulation_size=10,
         k=10,
         antithetic=False,  # whether to use antithetic sampling
+        seed=None,
     ):
         super().__init__(
             num_params,
@@ -815,6 +914,7 @@ class NSES(NSAbstract):
             metapopulation_size,
             k,
             antithetic,
+            seed,
         )
 
 
@@ -831,6 +931,7 @@ class NSRES(NSAbstract):
         popsize=256,  # population size
         k=10,
         antithetic=False,
+        seed=None,
     ):
         super().__init__(
             num_params,
@@ -841,6 +942,7 @@ class NSRES(NSAbstract):
             metapopulation_size,
             k,
             antithetic,
+            seed,
         )
 
 
@@ -859,6 +961,7 @@ class NSRAES(NSAbstract):
         weight_change=0.05,
         weight_change_threshold=50,
         antithetic=False,
+        seed=None,
     ):
         super().__init__(
             num_params,
@@ -869,6 +972,7 @@ class NSRAES(NSAbstract):
             metapopulation_size,
             k,
             antithetic,
+            seed,
         )
         self.weight_change = weight_change
         self.best_time = 0
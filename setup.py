@@ -17,6 +17,7 @@ setup(
         "gym==0.9.4",
         "idna==2.9",
         "mpi4py==3.0.3",
+        "numba>=0.53",
         "numpy>=1.19.3",
         "opencv-python==4.5.1.48",
         "pybullet==3.0.8",
@@ -79,7 +79,8 @@ def initialize_settings(sigma_init=0.1, sigma_decay=0.9999):
       sigma_limit=0.02,
       elite_ratio=0.1,
       weight_decay=0.005,
-      popsize=population)
+      popsize=population,
+      seed=seed_start)
     es = ses
   elif optimizer == 'ga':
     ga = SimpleGA(num_params,
@@ -88,7 +89,8 @@ def initialize_settings(sigma_init=0.1, sigma_decay=0.9999):
       sigma_limit=0.02,
       elite_ratio=0.1,
       weight_decay=0.005,
-      popsize=population)
+      popsize=population,
+      seed=seed_start)
     es = ga
   elif optimizer == 'cma':
     cma = CMAES(num_params,
@@ -105,7 +107,8 @@ def initialize_settings(sigma_init=0.1, sigma_decay=0.9999):
       learning_rate_decay=1.0,
       learning_rate_limit=0.01,
       weight_decay=0.005,
-      popsize=population)
+      popsize=population,
+      seed=seed_start)
     es = pepg
   else:
     oes = OpenES(num_params,
@@ -117,7 +120,8 @@ def initialize_settings(sigma_init=0.1, sigma_decay=0.9999):
       learning_rate_limit=0.01,
       antithetic=antithetic,
       weight_decay=0.005,
-      popsize=population)
+      popsize=population,
+      seed=seed_start)
     es = oes
 
   PRECISION = 10000